@@ -2,6 +2,7 @@
 
 #include <QByteArray>
 #include <QDir>
+#include <QFile>
 #include <QFileInfo>
 #include <QRegularExpression>
 
@@ -76,6 +77,15 @@ CommandLineOptions parseCommandLine(const QStringList &args)
       } else {
         options.invalidOption = arg;
       }
+    } else if (arg == QLatin1String("-testSaveBatch") ||
+               arg == QLatin1String("--test-save-batch")) {
+      if ((i + 2) < args.size()) {
+        options.testSave = true;
+        options.testSaveBatchManifestPath = args.at(++i);
+        options.testSaveBatchOutputDir = args.at(++i);
+      } else {
+        options.invalidOption = arg;
+      }
     } else if (arg == QLatin1String("-testExitAfterMs") ||
                arg == QLatin1String("--test-exit-after-ms")) {
       if ((i + 1) < args.size()) {
@@ -218,6 +228,35 @@ QStringList resolveDisplayArguments(const QStringList &files)
   return resolved;
 }
 
+bool loadDisplayManifest(const QString &manifestPath, QStringList *files,
+    QString *errorMessage)
+{
+  QFile file(manifestPath);
+  if (!file.open(QIODevice::ReadOnly | QIODevice::Text)) {
+    if (errorMessage) {
+      *errorMessage = QStringLiteral("Failed to open manifest %1: %2")
+          .arg(manifestPath, file.errorString());
+    }
+    return false;
+  }
+
+  // One display file per line; blank lines and # comments are skipped and
+  // relative entries are taken relative to the manifest itself.
+  const QDir manifestDir = QFileInfo(manifestPath).absoluteDir();
+  while (!file.atEnd()) {
+    const QString entry = QString::fromLocal8Bit(file.readLine()).trimmed();
+    if (entry.isEmpty() || entry.startsWith(QLatin1Char('#'))) {
+      continue;
+    }
+    if (QFileInfo(entry).isAbsolute()) {
+      files->push_back(entry);
+    } else {
+      files->push_back(manifestDir.filePath(entry));
+    }
+  }
+  return true;
+}
+
 MacroMap parseMacroDefinitionString(const QString &macroString)
 {
   MacroMap macros;
@@ -49,6 +49,8 @@ struct CommandLineOptions {
   QStringList resolvedDisplayFiles;
   QString displayFont = QStringLiteral("alias");
   QString testSaveOutputPath = QStringLiteral("/tmp/qtedmTest.adl");
+  QString testSaveBatchManifestPath;
+  QString testSaveBatchOutputDir;
   QString testDumpStatePath;
   QString testCaptureScreenshotPath;
   QString testReadyFilePath;
@@ -62,5 +64,7 @@ CommandLineOptions parseCommandLine(const QStringList &args);
 QStringList displaySearchPaths();
 QString resolveDisplayFile(const QString &fileArgument);
 QStringList resolveDisplayArguments(const QStringList &files);
+bool loadDisplayManifest(const QString &manifestPath, QStringList *files,
+    QString *errorMessage);
 MacroMap parseMacroDefinitionString(const QString &macroString);
 std::optional<GeometrySpec> geometrySpecFromString(const QString &geometry);
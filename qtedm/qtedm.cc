@@ -123,6 +123,7 @@ void printUsage(const QString &program)
       "  [-displayFont alias|scalable]\n"
       "  [-testSave]\n"
       "  [-testSaveOutput output-file]\n"
+      "  [-testSaveBatch manifest-file output-dir]\n"
       "  [-testDumpState output-file]\n"
       "  [-testCaptureScreenshot output-file]\n"
       "  [-testReadyFile output-file]\n"
@@ -753,6 +754,16 @@ int main(int argc, char *argv[])
   const QStringList args = QCoreApplication::arguments();
   CommandLineOptions options = parseCommandLine(args);
   QTEDM_TIMING_MARK("Command line parsed");
+  const bool testSaveBatch = !options.testSaveBatchManifestPath.isEmpty();
+  if (testSaveBatch) {
+    QString errorMessage;
+    if (!loadDisplayManifest(options.testSaveBatchManifestPath,
+            &options.displayFiles, &errorMessage)) {
+      fprintf(stderr, "\n%s\n", errorMessage.toLocal8Bit().constData());
+      fflush(stderr);
+      return 1;
+    }
+  }
   options.resolvedDisplayFiles = resolveDisplayArguments(options.displayFiles);
   const std::optional<GeometrySpec> geometrySpec =
       geometrySpecFromString(options.displayGeometry);
@@ -2328,6 +2339,11 @@ int main(int argc, char *argv[])
   bool loadedAnyDisplay = false;
   DisplayWindow *testSaveWindow = nullptr;
   DisplayWindow *testCaptureWindow = nullptr;
+  QList<QPair<QPointer<DisplayWindow>, QString>> testSaveBatchTargets;
+  // resolveDisplayArguments reports and drops manifest entries it cannot
+  // resolve; the batch must still fail for them, as -testSave does.
+  bool testSaveBatchLoadFailed = testSaveBatch
+      && options.resolvedDisplayFiles.size() != options.displayFiles.size();
 
   if (!options.sessionName.isEmpty()) {
     const QList<DisplayWindow *> restored =
@@ -2351,8 +2367,15 @@ int main(int argc, char *argv[])
         const QString message = errorMessage.isEmpty()
             ? QStringLiteral("Failed to open display:\n%1").arg(resolved)
             : errorMessage;
-        QMessageBox::critical(&win, QStringLiteral("Open Display"),
-            message);
+        if (testSaveBatch) {
+          // A modal dialog would stall the rest of the batch.
+          fprintf(stderr, "\n%s\n", message.toLocal8Bit().constData());
+          fflush(stderr);
+          testSaveBatchLoadFailed = true;
+        } else {
+          QMessageBox::critical(&win, QStringLiteral("Open Display"),
+              message);
+        }
         delete displayWin;
         continue;
       }
@@ -2373,7 +2396,12 @@ int main(int argc, char *argv[])
       if (!testCaptureWindow) {
         testCaptureWindow = displayWin;
       }
-      if (options.testSave) {
+      if (testSaveBatch) {
+        testSaveBatchTargets.append(qMakePair(
+            QPointer<DisplayWindow>(displayWin),
+            QDir(options.testSaveBatchOutputDir).filePath(
+                QFileInfo(resolved).fileName())));
+      } else if (options.testSave) {
         break;
       }
     }
@@ -2400,7 +2428,35 @@ int main(int argc, char *argv[])
     });
   }
 
-  if (options.testSave) {
+  if (testSaveBatch) {
+    if (!testSaveWindow) {
+      fprintf(stderr, "\nFailed to load any ADL file for -testSaveBatch\n");
+      fflush(stderr);
+      return 1;
+    }
+    QTimer::singleShot(0, &win,
+        [targets = testSaveBatchTargets,
+            status = testSaveBatchLoadFailed ? 1 : 0]() mutable {
+      for (const auto &target : targets) {
+        const QString &outputPath = target.second;
+        QString errorMessage;
+        DisplayWindow *window = target.first.data();
+        if (!window) {
+          fprintf(stderr, "\nDisplay window unavailable for test save of %s\n",
+              outputPath.toLocal8Bit().constData());
+          fflush(stderr);
+          status = 1;
+        } else if (!ensureParentDirectoryExists(outputPath, &errorMessage)
+            || !window->saveToPath(outputPath)) {
+          fprintf(stderr, "\nFailed to save display to %s\n",
+              outputPath.toLocal8Bit().constData());
+          fflush(stderr);
+          status = 1;
+        }
+      }
+      QCoreApplication::exit(status);
+    });
+  } else if (options.testSave) {
     if (!testSaveWindow) {
       fprintf(stderr, "\nFailed to load ADL file for -testSave\n");
       fflush(stderr);
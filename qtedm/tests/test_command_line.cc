@@ -1,5 +1,6 @@
 #include <QtTest/QtTest>
 
+#include <QDir>
 #include <QFile>
 #include <QFileInfo>
 #include <QTemporaryDir>
@@ -47,6 +48,8 @@ private slots:
   void resolvesDisplayFilesFromSearchPath();
   void parsesMacrosAndGeometry();
   void parsesTestAutomationOptions();
+  void parsesTestSaveBatch();
+  void loadsDisplayManifest();
 };
 
 void TestCommandLine::parsesCommonOptions()
@@ -199,6 +202,70 @@ void TestCommandLine::parsesTestAutomationOptions()
   QCOMPARE(options.displayFiles, QStringList{QStringLiteral("screen.adl")});
 }
 
+void TestCommandLine::parsesTestSaveBatch()
+{
+  const CommandLineOptions options = parseCommandLine(QStringList{
+      QStringLiteral("qtedm"),
+      QStringLiteral("-testSaveBatch"),
+      QStringLiteral("/tmp/manifest.txt"),
+      QStringLiteral("/tmp/out"),
+  });
+
+  QVERIFY(options.testSave);
+  QVERIFY(options.invalidOption.isEmpty());
+  QCOMPARE(options.testSaveBatchManifestPath,
+      QStringLiteral("/tmp/manifest.txt"));
+  QCOMPARE(options.testSaveBatchOutputDir, QStringLiteral("/tmp/out"));
+  QVERIFY(options.displayFiles.isEmpty());
+
+  const CommandLineOptions missing = parseCommandLine(QStringList{
+      QStringLiteral("qtedm"),
+      QStringLiteral("-testSaveBatch"),
+      QStringLiteral("/tmp/manifest.txt"),
+  });
+  QCOMPARE(missing.invalidOption, QStringLiteral("-testSaveBatch"));
+}
+
+void TestCommandLine::loadsDisplayManifest()
+{
+  QTemporaryDir dir;
+  QVERIFY(dir.isValid());
+
+  const QString manifestPath = dir.filePath(QStringLiteral("manifest.txt"));
+  QFile file(manifestPath);
+  QVERIFY(file.open(QIODevice::WriteOnly | QIODevice::Text));
+  QVERIFY(file.write("# displays\n"
+      "\n"
+      "  screen.adl  \n"
+      "notes.txt\n"
+      "/abs/other.adl\n") > 0);
+  file.close();
+
+  QStringList files;
+  QString errorMessage;
+  QVERIFY(loadDisplayManifest(manifestPath, &files, &errorMessage));
+  QCOMPARE(files, (QStringList{
+      QDir(dir.path()).filePath(QStringLiteral("screen.adl")),
+      QDir(dir.path()).filePath(QStringLiteral("notes.txt")),
+      QStringLiteral("/abs/other.adl")}));
+
+  // Entries with the wrong suffix or that do not exist are dropped, which
+  // -testSaveBatch detects by comparing the counts.
+  QFile screen(dir.filePath(QStringLiteral("screen.adl")));
+  QVERIFY(screen.open(QIODevice::WriteOnly | QIODevice::Text));
+  QVERIFY(screen.write("file {\n}\n") > 0);
+  screen.close();
+  const QStringList resolved = resolveDisplayArguments(files);
+  QCOMPARE(resolved,
+      QStringList{QFileInfo(screen.fileName()).absoluteFilePath()});
+
+  files.clear();
+  QVERIFY(!loadDisplayManifest(dir.filePath(QStringLiteral("missing.txt")),
+      &files, &errorMessage));
+  QVERIFY(!errorMessage.isEmpty());
+  QVERIFY(files.isEmpty());
+}
+
 QTEST_APPLESS_MAIN(TestCommandLine)
 
 #include "test_command_line.moc"
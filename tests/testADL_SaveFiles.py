@@ -2,12 +2,18 @@
 """Validate round-trip ADL saves produced by qtedm."""
 
 import argparse
+import difflib
+import itertools
 import os
 import platform
+import re
+import shutil
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Callable, List, NamedTuple, Optional, Set, Tuple
+from typing import Iterator, List, NamedTuple, Optional, Set, Tuple
 
 
 EXIT_SETUP_ERROR = 3
@@ -16,41 +22,49 @@ EXIT_DIFF_FAILURE = 5
 
 
 class LineEntry(NamedTuple):
-  """Single ADL line paired with its 1-based line number."""
+  """Single raw ADL line paired with its 1-based line number."""
 
-  text: str
+  text: bytes
   line_no: int
 
 
-def _entries_from_lines(lines: List[str]) -> List[LineEntry]:
-  return [LineEntry(text=line, line_no=idx + 1) for idx, line in enumerate(lines)]
-
-
-def _rebuild_entries_after_filter(
-    entries: List[LineEntry], filtered_lines: List[str]) -> List[LineEntry]:
-  """Return new entries list aligned to the filtered strings."""
-  if not filtered_lines:
-    return []
-  rebuilt: List[LineEntry] = []
-  target_idx = 0
-  total = len(filtered_lines)
-  for entry in entries:
-    if entry.text == filtered_lines[target_idx]:
-      rebuilt.append(LineEntry(filtered_lines[target_idx], entry.line_no))
-      target_idx += 1
-      if target_idx == total:
-        break
-  if target_idx != total:
-    raise RuntimeError("Failed to realign filtered ADL lines with their origins")
-  return rebuilt
-
-
-def _apply_string_filter(
-    entries: List[LineEntry], filter_func: Callable[[List[str]], List[str]]
-) -> List[LineEntry]:
-  """Run existing string-based filters while keeping line numbers."""
-  filtered = filter_func([entry.text for entry in entries])
-  return _rebuild_entries_after_filter(entries, filtered)
+# Single-byte guards for the normalization filters.  "ord(c) in line" is
+# answered by CPython's C bytes code with a single memchr, while the same
+# test with a one-byte bytes needle takes a slower generic search path.  Keep
+# these checks as integer membership tests.
+_QUOTE = ord('"')
+_OPEN_BRACE = ord("{")
+_CLOSE_BRACE = ord("}")
+_OPEN_PAREN = ord("(")
+
+
+def _brace_deltas(lines: List[bytes]) -> List[int]:
+  """Return the net number of braces each line opens."""
+  return [
+      line.count(b"{") - line.count(b"}")
+      if _OPEN_BRACE in line or _CLOSE_BRACE in line else 0
+      for line in lines
+  ]
+
+
+def _block_ends(deltas: List[int]) -> List[int]:
+  """Return the index of the line that closes the block each line opens.
+
+  A block ends on the first line where the running brace depth drops back
+  to (or below) the depth it started at, so a line that opens no block ends
+  on itself and an unterminated block runs to the last line.
+  """
+  ends = [len(deltas) - 1] * len(deltas)
+  # Lines whose block is still open, with the depth before each one; the
+  # depths strictly increase towards the top of the stack.
+  open_lines: List[Tuple[int, int]] = []
+  depth = 0
+  for idx, delta in enumerate(deltas):
+    open_lines.append((depth, idx))
+    depth += delta
+    while open_lines and depth <= open_lines[-1][0]:
+      ends[open_lines.pop()[1]] = idx
+  return ends
 
 
 def _native_child_path(path: Path) -> str:
@@ -66,28 +80,122 @@ def _native_child_path(path: Path) -> str:
     return result.stdout.strip()
   return str(path)
 
-def run_qtedm(adl_path: Path, qtedm_path: Path, output_path: Path) -> int:
-  """Invoke qtedm -testSave for the provided ADL file."""
+def _run_qtedm(qtedm_path: Path, arguments: List[str], label: Path) -> int:
+  """Invoke qtedm with arguments, reporting its output if the run fails.
+
+  stderr is merged into the stdout pipe, so each run drains one pipe and
+  the usage text and errors qtedm prints keep their original order.
+  """
   result = subprocess.run(
-      [
-          str(qtedm_path),
-          "-testSave",
-          "-testSaveOutput",
-          _native_child_path(output_path),
-          _native_child_path(adl_path),
-      ],
+      [str(qtedm_path)] + arguments,
       stdout=subprocess.PIPE,
-      stderr=subprocess.PIPE,
-      universal_newlines=True,
+      stderr=subprocess.STDOUT,
       check=False,
   )
   if result.returncode != 0:
+    # Output is kept as bytes and only decoded when it is going to be shown.
+    output = result.stdout.decode(errors="replace")
     sys.stderr.write(
-        f"qtedm -testSave failed for {adl_path}\nSTDOUT:\n{result.stdout}\nSTDERR:\n{result.stderr}\n"
+        f"qtedm {arguments[0]} failed for {label}\nOUTPUT:\n{output}\n"
     )
   return result.returncode
 
 
+def run_qtedm(adl_path: Path, qtedm_path: Path, output_path: Path) -> int:
+  """Invoke qtedm -testSave for the provided ADL file."""
+  return _run_qtedm(
+      qtedm_path,
+      [
+          "-testSave",
+          "-testSaveOutput",
+          _native_child_path(output_path),
+          _native_child_path(adl_path),
+      ],
+      adl_path,
+  )
+
+
+def run_qtedm_batch(manifest_path: Path, output_dir: Path,
+                    qtedm_path: Path) -> int:
+  """Invoke qtedm -testSaveBatch for every ADL file listed in a manifest."""
+  return _run_qtedm(
+      qtedm_path,
+      [
+          "-testSaveBatch",
+          _native_child_path(manifest_path),
+          _native_child_path(output_dir),
+      ],
+      manifest_path,
+  )
+
+
+class SaveResult(NamedTuple):
+  """Outcome of one qtedm -testSave run; stage names the failing step."""
+
+  adl_path: Path
+  output_path: Path
+  stage: Optional[str]
+
+
+BATCH_SIZE = 64
+
+
+def batch_adl_files(adl_files: List[Path], batch_size: int) -> List[List[Path]]:
+  """Split ADL files into batches whose members have distinct file names."""
+  batches: List[List[Path]] = []
+  names: Set[str] = set()
+  for adl_path in adl_files:
+    if not batches or len(batches[-1]) >= batch_size or adl_path.name in names:
+      batches.append([])
+      names = set()
+    batches[-1].append(adl_path)
+    names.add(adl_path.name)
+  return batches
+
+
+def save_adl(adl_path: Path, qtedm_path: Path, output_path: Path) -> SaveResult:
+  """Run qtedm -testSave for one file and confirm it produced output."""
+  if output_path.exists():
+    output_path.unlink()
+  if run_qtedm(adl_path, qtedm_path, output_path) != 0:
+    return SaveResult(adl_path, output_path, "qtedm")
+  if not output_path.is_file():
+    sys.stderr.write(f"Expected output file not found: {output_path}\n")
+    return SaveResult(adl_path, output_path, "output")
+  return SaveResult(adl_path, output_path, None)
+
+
+def save_adl_batch(adl_paths: List[Path], qtedm_path: Path,
+                   batch_dir: Path) -> List[SaveResult]:
+  """Save a batch of ADL files with one qtedm run, one file at a time on error.
+
+  The manifest and the saved files all live in batch_dir, an empty directory
+  owned by this batch alone.
+  """
+  output_dir = batch_dir / "saved"
+  output_dir.mkdir()
+  output_paths = [output_dir / adl_path.name for adl_path in adl_paths]
+  manifest_path = batch_dir / "manifest.txt"
+  manifest_path.write_text(
+      "".join(f"{_native_child_path(adl_path)}\n" for adl_path in adl_paths))
+  if run_qtedm_batch(manifest_path, output_dir, qtedm_path) == 0:
+    results = []
+    for adl_path, output_path in zip(adl_paths, output_paths):
+      stage = None
+      if not output_path.is_file():
+        sys.stderr.write(f"Expected output file not found: {output_path}\n")
+        stage = "output"
+      results.append(SaveResult(adl_path, output_path, stage))
+    return results
+  # Rerun the batch file by file so the failure is pinned to one ADL file.
+  results = []
+  for adl_path, output_path in zip(adl_paths, output_paths):
+    results.append(save_adl(adl_path, qtedm_path, output_path))
+    if results[-1].stage:
+      break
+  return results
+
+
 def diff_has_only_name_changes(diff_output: str) -> bool:
   """Return True if diff output only shows changes to name fields."""
   for line in diff_output.splitlines():
@@ -165,866 +273,450 @@ def report_first_difference(diff_output: str) -> None:
       print(f"  new line {added_line}: {added_text}")
 
 
-def strip_cartesian_counts_with_pv(lines: List[str]) -> List[str]:
-  """Remove count= lines for cartesian plots that define countPvName."""
-  to_remove: Set[int] = set()
-  inside_cartesian = False
-  depth = 0
-  has_count_pv = False
-  block_count_lines: List[int] = []
-
-  for idx, line in enumerate(lines):
-    if not inside_cartesian:
-      if "\"cartesian plot\"" in line:
-        inside_cartesian = True
-        depth = line.count("{") - line.count("}")
-        has_count_pv = False
-        block_count_lines = []
-        if depth <= 0:
-          depth = 0
-        continue
-    stripped = line.strip()
-    if inside_cartesian and depth == 1:
-      lower = stripped.lower()
-      if lower.startswith("count="):
-        block_count_lines.append(idx)
-      if "countpvname" in lower:
-        has_count_pv = True
-    if inside_cartesian:
-      depth += line.count("{")
-      depth -= line.count("}")
-      if depth <= 0:
-        if has_count_pv:
-          to_remove.update(block_count_lines)
-        inside_cartesian = False
-        depth = 0
-
-  return [line for idx, line in enumerate(lines) if idx not in to_remove]
-
-
-def strip_cartesian_trace_yside_zero(lines: List[str]) -> List[str]:
-  """Remove yside=0 entries inside cartesian trace blocks."""
-  result: List[str] = []
-  inside_trace = False
-  depth = 0
-
-  for line in lines:
-    stripped = line.strip().lower()
-    if not inside_trace and stripped.startswith("trace["):
-      inside_trace = True
-      depth = line.count("{") - line.count("}")
-      result.append(line)
-      if depth <= 0:
-        inside_trace = False
-      continue
-
-    if inside_trace:
-      if stripped != "yside=0":
-        result.append(line)
-      depth += line.count("{") - line.count("}")
-      if depth <= 0:
-        inside_trace = False
-      continue
-
-    result.append(line)
-
-  return result
-
-
-def strip_default_basic_attribute_width(lines: List[str]) -> List[str]:
-  """Remove width=1 lines inside any basic attribute block."""
-  result: List[str] = []
-  inside_basic = False
-  depth = 0
-
-  for line in lines:
-    stripped = line.strip().lower()
-    if not inside_basic and stripped.startswith('"basic attribute"'):
-      inside_basic = True
-      depth = line.count("{") - line.count("}")
-      result.append(line)
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    if inside_basic:
-      if line.strip() != "width=1":
-        result.append(line)
-      depth += line.count("{") - line.count("}")
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    result.append(line)
-
-  return result
-
-
-def _strip_default_width_from_block(block_lines: List[str]) -> List[str]:
-  """Return block lines omitting width=1 entries inside basic attribute."""
-  result: List[str] = []
-  inside_basic = False
-  basic_depth = 0
-
-  for line in block_lines:
-    stripped = line.strip()
-    if not inside_basic and stripped.startswith('"basic attribute"'):
-      inside_basic = True
-      basic_depth = line.count("{") - line.count("}")
-      result.append(line)
-      if basic_depth <= 0:
-        inside_basic = False
-      continue
-
-    if inside_basic:
-      if stripped != "width=1":
-        result.append(line)
-      basic_depth += line.count("{") - line.count("}")
-      if basic_depth <= 0:
-        inside_basic = False
-      continue
-
-    result.append(line)
-
-  return result
-
-
-def strip_default_width_for_widgets(
-    lines: List[str], widget_names: Tuple[str, ...]) -> List[str]:
-  """Remove default width=1 entries added inside specified widgets."""
-  result: List[str] = []
-  i = 0
-  while i < len(lines):
-    line = lines[i]
-    stripped = line.strip()
-    if any(stripped.startswith(name) for name in widget_names):
-      block: List[str] = []
-      depth = 0
-      while i < len(lines):
-        block_line = lines[i]
-        block.append(block_line)
-        depth += block_line.count("{") - block_line.count("}")
-        i += 1
-        if depth <= 0:
-          break
-      result.extend(_strip_default_width_from_block(block))
-      continue
-
-    result.append(line)
-    i += 1
-
-  return result
-
-
-def _strip_text_basic_attribute_fill(block_lines: List[str]) -> List[str]:
-  """Remove fill= lines from text widget basic attribute blocks."""
-  result: List[str] = []
-  inside_basic = False
-  depth = 0
-
-  for line in block_lines:
-    stripped = line.strip()
-    normalized = stripped.lower()
-    normalized_compact = normalized.replace(" ", "")
-    if not inside_basic and normalized.startswith('"basic attribute"'):
-      inside_basic = True
-      depth = line.count("{") - line.count("}")
-      result.append(line)
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    if inside_basic:
-      if not normalized_compact.startswith("fill="):
-        result.append(line)
-      depth += line.count("{") - line.count("}")
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    result.append(line)
-
-  return result
-
-
-def strip_text_fill(lines: List[str]) -> List[str]:
-  """Remove basic attribute fill lines added to text widgets."""
-  result: List[str] = []
-  i = 0
-  while i < len(lines):
-    line = lines[i]
-    stripped = line.strip()
-    normalized = stripped.lower()
-    if normalized.startswith("text {"):
-      block: List[str] = []
-      depth = 0
-      while i < len(lines):
-        block_line = lines[i]
-        block.append(block_line)
-        depth += block_line.count("{") - block_line.count("}")
-        i += 1
-        if depth <= 0:
-          break
-      result.extend(_strip_text_basic_attribute_fill(block))
-      continue
-
-    result.append(line)
-    i += 1
-
-  return result
-
-
-def _strip_text_basic_attribute_width(block_lines: List[str]) -> List[str]:
-  """Remove width= lines from text widget basic attribute blocks."""
-  result: List[str] = []
-  inside_basic = False
-  depth = 0
-
-  for line in block_lines:
-    stripped = line.strip()
-    normalized = stripped.lower()
-    normalized_compact = normalized.replace(" ", "")
-    if not inside_basic and normalized.startswith('"basic attribute"'):
-      inside_basic = True
-      depth = line.count("{") - line.count("}")
-      result.append(line)
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    if inside_basic:
-      if not normalized_compact.startswith("width="):
-        result.append(line)
-      depth += line.count("{") - line.count("}")
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    result.append(line)
-
-  return result
-
-
-def strip_text_width(lines: List[str]) -> List[str]:
-  """Remove width= lines from text widget basic attribute sections."""
-  result: List[str] = []
-  i = 0
-  while i < len(lines):
-    line = lines[i]
-    stripped = line.strip()
-    normalized = stripped.lower()
-    if normalized.startswith("text {"):
-      block: List[str] = []
-      depth = 0
-      while i < len(lines):
-        block_line = lines[i]
-        block.append(block_line)
-        depth += block_line.count("{") - block_line.count("}")
-        i += 1
-        if depth <= 0:
-          break
-      result.extend(_strip_text_basic_attribute_width(block))
-      continue
-
-    result.append(line)
-    i += 1
-
-  return result
-
-
-def _strip_oval_basic_attribute_width(block_lines: List[str]) -> List[str]:
-  """Remove width= lines inside oval basic attribute sections."""
-  result: List[str] = []
-  inside_basic = False
-  depth = 0
-
-  for line in block_lines:
-    stripped = line.strip()
-    normalized = stripped.lower()
-    normalized_compact = normalized.replace(" ", "")
-    if not inside_basic and normalized.startswith('"basic attribute"'):
-      inside_basic = True
-      depth = line.count("{") - line.count("}")
-      result.append(line)
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    if inside_basic:
-      if not normalized_compact.startswith("width="):
-        result.append(line)
-      depth += line.count("{") - line.count("}")
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    result.append(line)
-
-  return result
-
-
-def strip_oval_width(lines: List[str]) -> List[str]:
-  """Remove width= lines from oval widget basic attribute sections."""
-  result: List[str] = []
-  i = 0
-  while i < len(lines):
-    line = lines[i]
-    stripped = line.strip().lower()
-    if stripped.startswith("oval"):
-      block: List[str] = []
-      depth = 0
-      while i < len(lines):
-        block_line = lines[i]
-        block.append(block_line)
-        depth += block_line.count("{") - block_line.count("}")
-        i += 1
-        if depth <= 0:
-          break
-      result.extend(_strip_oval_basic_attribute_width(block))
-      continue
-
-    result.append(line)
-    i += 1
-
-  return result
-
-
-def _strip_arc_basic_attribute_width(block_lines: List[str]) -> List[str]:
-  """Remove width= lines inside arc basic attribute sections."""
-  result: List[str] = []
-  inside_basic = False
-  depth = 0
-
-  for line in block_lines:
-    stripped = line.strip()
-    normalized = stripped.lower()
-    normalized_compact = normalized.replace(" ", "")
-    if not inside_basic and normalized.startswith('"basic attribute"'):
+# State of the first points section inside a polyline; an open section never
+# closes, so it is not known to be empty.
+_POINTS_UNSEEN = 0
+_POINTS_OPEN = 1
+_POINTS_EMPTY = 2
+_POINTS_FILLED = 3
+
+# Compacted key prefixes qtedm adds to basic attribute blocks of these widgets.
+_BASIC_ATTRIBUTE_DEFAULTS = {
+    "text": (b"fill=", b"width="),
+    "oval": (b"width=",),
+    "arc": (b"width=",),
+    "polyline": (b"fill=",),
+}
+
+
+class _BlockFrame:
+  """Brace block that strip_widget_defaults is currently inside."""
+
+  __slots__ = ("kind", "base", "start", "exact", "count_lines",
+               "has_count_pv", "points_state")
+
+  def __init__(self, kind: str, base: int, start: int, exact: bool) -> None:
+    self.kind = kind
+    self.base = base
+    self.start = start
+    self.exact = exact
+    self.count_lines: List[int] = []
+    self.has_count_pv = False
+    self.points_state = _POINTS_UNSEEN
+
+
+# Classifies a stripped line as one of the block headers tracked by
+# strip_widget_defaults in a single match; the name of the group that matched
+# is the block kind.  "cartesian plot" counts anywhere on the line, the other
+# headers must lead it, and polyline and points are case-sensitive.
+_WIDGET_BLOCK_HEAD = re.compile(
+    rb'.*?(?P<cartesian>"cartesian plot")'
+    rb'|(?P<basic>(?i:"basic attribute"))'
+    rb'|(?P<text>(?i:text \{))'
+    rb'|(?P<trace>(?i:trace\[))'
+    rb'|(?P<oval>(?i:oval))(?= |$)'
+    rb'|(?P<arc>(?i:arc))(?= |$)'
+    rb'|(?P<polyline>polyline)(?= |$)'
+    rb'|(?P<points>points)(?= |$)'
+)
+
+
+def _points_section_state(
+    lines: List[bytes], deltas: List[int], block_ends: List[int],
+    keep: bytearray, start: int) -> int:
+  """Return the state of the points section whose header is at start.
+
+  Lines an earlier filter dropped are skipped, as the other filters do.
+  """
+  end = block_ends[start] + 1
+  kept = [idx for idx in range(start, end) if keep[idx]]
+  # One memchr over the joined section instead of a test per line.
+  if _OPEN_PAREN in b"".join([lines[idx] for idx in kept]):
+    return _POINTS_FILLED
+  if end == len(lines) and sum(deltas[idx] for idx in kept) > 0:
+    return _POINTS_OPEN
+  return _POINTS_EMPTY
+
+
+def _is_default_basic_attribute_line(
+    stack: List[_BlockFrame], stripped: bytes, normalized: bytes) -> bool:
+  """Return True if a basic attribute line only restates a widget default."""
+  if stripped == b"width=1":
+    return True
+  compact = normalized.replace(b" ", b"")
+  # A widget's defaults only apply to basic attribute blocks nested inside
+  # it, so the stack is walked outward from the innermost frame.
+  inside_basic = inside_exact_basic = False
+  for frame in reversed(stack):
+    if frame.kind == "basic":
       inside_basic = True
-      depth = line.count("{") - line.count("}")
-      result.append(line)
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    if inside_basic:
-      if not normalized_compact.startswith("width="):
-        result.append(line)
-      depth += line.count("{") - line.count("}")
-      if depth <= 0:
-        inside_basic = False
+      inside_exact_basic = inside_exact_basic or frame.exact
       continue
-
-    result.append(line)
-
-  return result
-
-
-def strip_arc_width(lines: List[str]) -> List[str]:
-  """Remove width= lines from arc widget basic attribute sections."""
-  result: List[str] = []
-  i = 0
-  while i < len(lines):
-    line = lines[i]
-    stripped = line.strip().lower()
-    if stripped.startswith("arc"):
-      block: List[str] = []
-      depth = 0
-      while i < len(lines):
-        block_line = lines[i]
-        block.append(block_line)
-        depth += block_line.count("{") - block_line.count("}")
-        i += 1
-        if depth <= 0:
-          break
-      result.extend(_strip_arc_basic_attribute_width(block))
+    prefixes = _BASIC_ATTRIBUTE_DEFAULTS.get(frame.kind)
+    if prefixes is None or not inside_basic:
       continue
+    if frame.kind == "polyline":
+      if inside_exact_basic and (
+          compact.startswith(prefixes) or compact == b"width=1"):
+        return True
+    elif compact.startswith(prefixes):
+      return True
+  return False
 
-    result.append(line)
-    i += 1
-
-  return result
 
+def strip_widget_defaults(
+    lines: List[bytes], lowered: List[bytes], deltas: List[int],
+    block_ends: List[int], keep: bytearray) -> None:
+  """Clear keep flags for widget-scoped defaults and empty polylines.
 
-def _strip_polyline_basic_attribute(block_lines: List[str]) -> List[str]:
-  """Remove fill entries and default widths from polyline basic attributes."""
-  result: List[str] = []
-  inside_basic = False
+  Drops width=1 from basic attribute blocks, count= from cartesian plots that
+  define countPvName, yside=0 from traces, fill/width entries qtedm adds to
+  text, oval, arc, and polyline basic attributes, and polyline blocks whose
+  points section is empty, all in a single pass.  Rectangle width=1 lines
+  fall under the basic attribute rule, and indicator precDefault=1 lines are
+  left to strip_default_value_lines.
+  """
+  stack: List[_BlockFrame] = []
   depth = 0
 
-  for line in block_lines:
-    stripped = line.strip()
-    normalized = stripped.lower()
-    normalized_compact = normalized.replace(" ", "")
-    if not inside_basic and stripped.startswith('"basic attribute"'):
-      inside_basic = True
-      depth = line.count("{") - line.count("}")
-      result.append(line)
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    if inside_basic:
-      if (not normalized_compact.startswith("fill=") and
-          normalized_compact != "width=1"):
-        result.append(line)
-      depth += line.count("{") - line.count("}")
-      if depth <= 0:
-        inside_basic = False
-      continue
-
-    result.append(line)
-
-  return result
-
-
-def strip_polyline_outline_fill(lines: List[str]) -> List[str]:
-  """Remove fill="outline" lines from polyline widgets."""
-  result: List[str] = []
-  i = 0
-  while i < len(lines):
-    line = lines[i]
-    stripped = line.strip()
-    if stripped.startswith("polyline"):
-      block: List[str] = []
-      depth = 0
-      while i < len(lines):
-        block_line = lines[i]
-        block.append(block_line)
-        depth += block_line.count("{") - block_line.count("}")
-        i += 1
-        if depth <= 0:
-          break
-      result.extend(_strip_polyline_basic_attribute(block))
-      continue
-
-    result.append(line)
-    i += 1
-
-  return result
-
-
-def _strip_indicator_limits(block_lines: List[str]) -> List[str]:
-  """Remove precDefault=1 entries inside indicator limits blocks."""
-  result: List[str] = []
-  inside_limits = False
-  limits_depth = 0
-
-  for line in block_lines:
-    stripped = line.strip()
-    if not inside_limits and stripped.startswith("limits"):
-      inside_limits = True
-      limits_depth = line.count("{") - line.count("}")
-      result.append(line)
-      if limits_depth <= 0:
-        inside_limits = False
-      continue
-
-    if inside_limits:
-      if stripped != "precDefault=1":
-        result.append(line)
-      limits_depth += line.count("{") - line.count("}")
-      if limits_depth <= 0:
-        inside_limits = False
-      continue
-
-    result.append(line)
-
-  return result
-
-
-def strip_indicator_prec_default(lines: List[str]) -> List[str]:
-  """Remove default precision lines added within indicator widgets."""
-  result: List[str] = []
-  i = 0
-  while i < len(lines):
-    line = lines[i]
-    stripped = line.strip()
-    if stripped.startswith("indicator"):
-      block: List[str] = []
-      depth = 0
-      while i < len(lines):
-        block_line = lines[i]
-        block.append(block_line)
-        depth += block_line.count("{") - block_line.count("}")
-        i += 1
-        if depth <= 0:
-          break
-      result.extend(_strip_indicator_limits(block))
-      continue
-
-    result.append(line)
-    i += 1
+  def close(frame: _BlockFrame, end: int) -> None:
+    if frame.kind == "polyline" and frame.points_state == _POINTS_EMPTY:
+      keep[frame.start:end] = bytes(end - frame.start)
+    elif frame.kind == "cartesian" and frame.has_count_pv:
+      for idx in frame.count_lines:
+        keep[idx] = 0
 
-  return result
-
-
-def _is_empty_polyline(block_lines: List[str]) -> bool:
-  """Return True if block has a points section with no coordinates."""
-  inside_points = False
-  saw_points = False
-  points_depth = 0
-  for line in block_lines:
-    stripped = line.strip()
-    if not inside_points and stripped.startswith("points"):
-      inside_points = True
-      saw_points = True
-      points_depth = line.count("{") - line.count("}")
-      if "(" in line:
-        return False
+  for idx, line in enumerate(lines):
+    if not keep[idx]:
       continue
-
-    if inside_points:
-      if "(" in line:
-        return False
-      points_depth += line.count("{") - line.count("}")
-      if points_depth <= 0:
-        inside_points = False
-        break
-
-  return saw_points and not inside_points
-
-
-def strip_empty_polyline_blocks(lines: List[str]) -> List[str]:
-  """Remove polyline blocks that define no points."""
-  result: List[str] = []
-  i = 0
-  while i < len(lines):
-    line = lines[i]
     stripped = line.strip()
-    if stripped.startswith("polyline"):
-      block: List[str] = []
-      depth = 0
-      while i < len(lines):
-        block_line = lines[i]
-        block.append(block_line)
-        depth += block_line.count("{") - block_line.count("}")
-        i += 1
-        if depth <= 0:
-          break
-      if _is_empty_polyline(block):
-        continue
-      result.extend(block)
-      continue
-
-    result.append(line)
-    i += 1
-
-  return result
-
-
-def strip_empty_children_blocks(lines: List[str]) -> List[str]:
-  """Drop children blocks that contain no child definitions."""
-  result: List[str] = []
-  i = 0
-  while i < len(lines):
-    line = lines[i]
-    stripped = line.strip().lower()
-    if stripped.startswith("children"):
-      block: List[str] = []
-      depth = 0
-      while i < len(lines):
-        block_line = lines[i]
-        block.append(block_line)
-        depth += block_line.count("{") - block_line.count("}")
-        i += 1
-        if depth <= 0:
-          break
-      inner_has_content = any(
-          blk_line.strip() and blk_line.strip() != "}"
-          for blk_line in block[1:]
-      )
-      if inner_has_content:
-        result.extend(block)
-      continue
-
-    result.append(line)
-    i += 1
-
-  return result
-
-
-def strip_default_dprecision(lines: List[str]) -> List[str]:
-  """Drop dPrecision entries that remain at the default 1.0."""
-  return [line for line in lines if line.strip() != "dPrecision=1.000000"]
-
-
-def strip_default_prec_zero(lines: List[str]) -> List[str]:
-  """Drop precDefault=0 entries that restate the default precision."""
-  return [line for line in lines if line.strip() != "precDefault=0"]
-
-
-def strip_default_prec_one(lines: List[str]) -> List[str]:
-  """Drop precDefault=1 entries that restate a widget's built-in precision."""
-  return [line for line in lines if line.strip() != "precDefault=1"]
-
-
-def strip_default_lopr_zero(lines: List[str]) -> List[str]:
-  """Drop loprDefault=0 entries when the low limit already defaults to zero."""
-  return [line for line in lines if line.strip() != "loprDefault=0"]
-
-
-def strip_default_hopr_hundred(lines: List[str]) -> List[str]:
-  """Drop hoprDefault=100 entries when the high limit already defaults to 100."""
-  return [line for line in lines if line.strip() != "hoprDefault=100"]
-
-
-def strip_default_channel_limit_sources(lines: List[str]) -> List[str]:
-  """Drop explicit *Src=\"channel\" lines when omission has the same meaning."""
-  defaults = {
-      'loprSrc="channel"',
-      'hoprSrc="channel"',
-      'precSrc="channel"',
-  }
-  return [line for line in lines if line.strip() not in defaults]
-
-
-def strip_default_direction_right(lines: List[str]) -> List[str]:
-  """Drop direction=\"right\" lines when rightward is the widget default."""
-  return [line for line in lines if line.strip() != 'direction="right"']
-
-
-def strip_default_dprecision_one(lines: List[str]) -> List[str]:
-  """Drop dPrecision=1.000000 entries when the default increment is 1."""
-  return [line for line in lines if line.strip() != "dPrecision=1.000000"]
-
-
-def strip_default_arc_angles(lines: List[str]) -> List[str]:
-  """Drop begin/path values that restate the arc defaults."""
-  defaults = {"begin=0", "path=5760"}
-  return [line for line in lines if line.strip() not in defaults]
+    normalized = lowered[idx]
+    polyline = None
+    counted = None
+    inside_basic = False
+    for frame in stack:
+      if frame.kind == "basic":
+        inside_basic = True
+      elif frame.kind == "trace":
+        if normalized == b"yside=0":
+          keep[idx] = 0
+      elif frame.kind == "cartesian":
+        if depth - frame.base == 1:
+          if normalized.startswith(b"count="):
+            counted = frame
+          if b"countpvname" in normalized:
+            frame.has_count_pv = True
+      elif frame.kind == "polyline":
+        polyline = frame
+    if inside_basic and _is_default_basic_attribute_line(
+        stack, stripped, normalized):
+      keep[idx] = 0
+
+    match = _WIDGET_BLOCK_HEAD.match(stripped)
+    kind = match.lastgroup if match else None
+    if kind == "points":
+      # A points section only matters as the first one inside a polyline,
+      # and it is settled as soon as its header is seen.
+      if polyline is not None and polyline.points_state == _POINTS_UNSEEN:
+        polyline.points_state = _points_section_state(
+            lines, deltas, block_ends, keep, idx)
+      kind = None
+    elif kind != "basic" and any(frame.kind == kind for frame in stack):
+      # Nested basic attribute blocks are tracked so that a widget inside an
+      # outer one still sees its own.
+      kind = None
+    if kind is not None:
+      stack.append(_BlockFrame(
+          kind, depth, idx, stripped.startswith(b'"basic attribute"')))
+    if counted is not None and keep[idx]:
+      counted.count_lines.append(idx)
+
+    depth += deltas[idx]
+    while stack and depth <= stack[-1].base:
+      close(stack.pop(), idx + 1)
+
+  # Unterminated cartesian plots keep their counts, but an unterminated
+  # polyline is still dropped if its points section closed empty.
+  for frame in stack:
+    if frame.kind == "polyline":
+      close(frame, len(lines))
+
+
+def strip_empty_children_blocks(
+    lowered: List[bytes], block_ends: List[int], keep: bytearray) -> None:
+  """Clear keep flags for children blocks that contain no child definitions."""
+  headers = [
+      idx for idx, stripped_lower in enumerate(lowered)
+      if stripped_lower.startswith(b"children")
+  ]
+  # Headers nested in a block that was already handled are skipped.
+  resume = 0
+  for start in headers:
+    if start < resume or not keep[start]:
+      continue
+    resume = block_ends[start] + 1
+    if not any(
+        keep[idx] and lowered[idx] not in (b"", b"}")
+        for idx in range(start + 1, resume)):
+      keep[start:resume] = bytes(resume - start)
+
+
+# Stripped lines that only restate a widget default and can be dropped anywhere.
+_DEFAULT_VALUE_LINES = frozenset((
+    b"dPrecision=1.000000",
+    b"precDefault=0",
+    b"precDefault=1",
+    b"loprDefault=0",
+    b"hoprDefault=100",
+    b'loprSrc="channel"',
+    b'hoprSrc="channel"',
+    b'precSrc="channel"',
+    b'direction="right"',
+    b"begin=0",
+    b"path=5760",
+))
+
+
+def strip_default_value_lines(lines: List[bytes], keep: bytearray) -> None:
+  """Clear keep flags for lines such as begin=0 that restate defaults."""
+  for idx, line in enumerate(lines):
+    if keep[idx] and line.strip() in _DEFAULT_VALUE_LINES:
+      keep[idx] = 0
 
 
-def _quoted_value(line: str) -> Optional[str]:
+def _quoted_value(line: bytes) -> Optional[bytes]:
   """Return the quoted portion of a simple key="value" line if present."""
-  first = line.find('"')
-  last = line.rfind('"')
+  first = line.find(b'"')
+  last = line.rfind(b'"')
   if first == -1 or last == -1 or last <= first:
     return None
   return line[first + 1:last]
 
 
-def _is_blank_channel_line(stripped_lower: str) -> bool:
+_CHANNEL_KEYS = (
+    b"chan=",
+    b"chana=",
+    b"chanb=",
+    b"chanc=",
+    b"chand=",
+    b"chane=",
+)
+
+
+def _is_blank_channel_line(stripped_lower: bytes) -> bool:
   """Return True when the line only assigns blank whitespace to a channel key."""
-  normalized = stripped_lower.replace(" ", "")
-  channel_keys = (
-      "chan=",
-      "chana=",
-      "chanb=",
-      "chanc=",
-      "chand=",
-      "chane=",
-  )
-  if not normalized.startswith(channel_keys):
+  normalized = stripped_lower.replace(b" ", b"")
+  if not normalized.startswith(_CHANNEL_KEYS):
     return False
   quoted = _quoted_value(stripped_lower)
   if quoted is None:
     return False
-  return quoted.strip() == ""
-
+  return quoted.strip() == b""
+
+
+def strip_blank_channel_lines(lowered: List[bytes], keep: bytearray) -> None:
+  """Clear keep flags for blank channels that behave like an omitted one."""
+  for idx, stripped_lower in enumerate(lowered):
+    if (keep[idx] and _QUOTE in stripped_lower
+        and _is_blank_channel_line(stripped_lower)):
+      keep[idx] = 0
+
+
+def strip_noop_dynamic_attribute_blocks(
+    lowered: List[bytes], block_ends: List[int], keep: bytearray) -> None:
+  """Clear keep flags for dynamic attributes that use only blank channels."""
+  headers = [
+      idx for idx, stripped_lower in enumerate(lowered)
+      if stripped_lower.startswith(b'"dynamic attribute"')
+  ]
+  # Headers nested in a block that was already handled are skipped.
+  resume = 0
+  for start in headers:
+    if start < resume or not keep[start]:
+      continue
+    resume = block_ends[start] + 1
+    has_non_blank_channel = False
+    for block_line in lowered[start:resume]:
+      if (_QUOTE in block_line
+          and block_line.replace(b" ", b"").startswith(_CHANNEL_KEYS)):
+        quoted = _quoted_value(block_line)
+        if quoted is not None and quoted.strip() != b"":
+          has_non_blank_channel = True
+          break
+    if not has_non_blank_channel:
+      keep[start:resume] = bytes(resume - start)
+
+
+def _trim_quoted_value(line: bytes) -> bytes:
+  """Return line with whitespace trimmed inside its quoted value."""
+  if _QUOTE not in line:
+    return line
+  first = line.find(b'"')
+  last = line.rfind(b'"')
+  # Only slice when the quoted value actually starts or ends with space.
+  if (last <= first or not (line[first + 1:first + 2].isspace()
+                            or line[last - 1:last].isspace())):
+    return line
+  return line[:first + 1] + line[first + 1:last].strip() + line[last:]
+
+
+def iter_normalized_entries(lines: List[bytes]) -> Iterator[LineEntry]:
+  """Yield LineEntries after removing allowed variations.
+
+  Lines are raw bytes: ADL files are ASCII, so nothing is decoded and the
+  bytes methods compare and lowercase without any Unicode handling.  Each
+  filter clears flags in one shared keep mask, skipping lines an earlier
+  filter already dropped, so no intermediate lists are built and line
+  numbers come straight from the surviving indices.  The case-insensitive
+  tests in every filter share one stripped, lowercased copy of the lines.
+  The surviving lines are trimmed and yielded lazily, so a comparison that
+  stops at the first mismatch never formats the rest of the file.
+  """
+  deltas = _brace_deltas(lines)
+  block_ends = _block_ends(deltas)
+  lowered = [line.strip().lower() for line in lines]
+  keep = bytearray(b"\x01") * len(lines)
+  strip_noop_dynamic_attribute_blocks(lowered, block_ends, keep)
+  strip_blank_channel_lines(lowered, keep)
+  strip_widget_defaults(lines, lowered, deltas, block_ends, keep)
+  strip_empty_children_blocks(lowered, block_ends, keep)
+  strip_default_value_lines(lines, keep)
 
-def strip_blank_channel_lines(lines: List[str]) -> List[str]:
-  """Drop blank channel assignments that behave like an omitted channel."""
-  result: List[str] = []
-  for line in lines:
-    stripped_lower = line.strip().lower()
-    if _is_blank_channel_line(stripped_lower):
+  for idx, line in enumerate(lines):
+    if not keep[idx]:
       continue
-    result.append(line)
-  return result
-
-
-def strip_noop_dynamic_attribute_blocks(lines: List[str]) -> List[str]:
-  """Drop dynamic attribute blocks that reference only blank channels."""
-  result: List[str] = []
-  i = 0
-  while i < len(lines):
-    line = lines[i]
-    stripped_lower = line.strip().lower()
-    if stripped_lower.startswith('"dynamic attribute"'):
-      block: List[str] = []
-      depth = 0
-      has_non_blank_channel = False
-      while i < len(lines):
-        block_line = lines[i]
-        block.append(block_line)
-        candidate = block_line.strip().lower()
-        normalized = candidate.replace(" ", "")
-        if normalized.startswith((
-            "chan=",
-            "chana=",
-            "chanb=",
-            "chanc=",
-            "chand=",
-            "chane=",
-        )):
-          quoted = _quoted_value(block_line)
-          if quoted is not None and quoted.strip() != "":
-            has_non_blank_channel = True
-        depth += block_line.count("{") - block_line.count("}")
-        i += 1
-        if depth <= 0:
-          break
-      if has_non_blank_channel:
-        result.extend(block)
+    # Quote trimming only removes whitespace, so the skip tests can read the
+    # shared lowercased copy before any trimming is done.
+    stripped_lower = lowered[idx]
+    if not stripped_lower:
       continue
+    if b"name" in stripped_lower:
+      continue
+    if stripped_lower.startswith(b"version="):
+      continue
+    yield LineEntry(text=_trim_quoted_value(line).strip(), line_no=idx + 1)
 
-    result.append(line)
-    i += 1
 
-  return result
+def normalize_entries_for_allowed_differences(
+    lines: List[bytes]) -> List[LineEntry]:
+  """Return LineEntries after removing allowed variations."""
+  return list(iter_normalized_entries(lines))
 
 
-def strip_edge_spaces_in_quotes(lines: List[str]) -> List[str]:
-  """Trim leading/trailing whitespace inside quoted attribute values."""
-  entries = strip_edge_spaces_in_quotes_entries(_entries_from_lines(lines))
-  return [entry.text for entry in entries]
+def files_match_with_allowed_variations(
+    original_entries: List[LineEntry], saved_lines: List[bytes]) -> bool:
+  """Check if files only differ by acceptable variations."""
+  # The saved side is normalized lazily, so the first mismatch ends the
+  # comparison; zip_longest pads the shorter side with None.
+  return all(
+      orig_entry and saved_entry and orig_entry.text == saved_entry.text
+      for orig_entry, saved_entry in itertools.zip_longest(
+          original_entries, iter_normalized_entries(saved_lines))
+  )
 
 
-def strip_edge_spaces_in_quotes_entries(
-    entries: List[LineEntry]) -> List[LineEntry]:
-  """Entry-aware version of quote trimming that preserves line numbers."""
-  result: List[LineEntry] = []
-  for entry in entries:
-    line = entry.text
-    first = line.find('"')
-    last = line.rfind('"')
-    if first == -1 or last == -1 or last <= first:
-      result.append(entry)
-      continue
-    value = line[first + 1:last]
-    trimmed = value.strip()
-    if trimmed != value:
-      line = line[:first + 1] + trimmed + line[last:]
-    result.append(LineEntry(text=line, line_no=entry.line_no))
-  return result
+def _whitespace_key(line: bytes) -> bytes:
+  """Return line with all whitespace removed, matching diff -w."""
+  return b"".join(line.split())
 
 
-def normalize_entries_for_allowed_differences(
-    lines: List[str]) -> List[LineEntry]:
-  """Return LineEntries after removing allowed variations."""
-  entries = _entries_from_lines(lines)
-  entries = _apply_string_filter(entries, strip_noop_dynamic_attribute_blocks)
-  entries = _apply_string_filter(entries, strip_blank_channel_lines)
-  entries = _apply_string_filter(entries, strip_default_basic_attribute_width)
-  entries = _apply_string_filter(entries, strip_cartesian_counts_with_pv)
-  entries = _apply_string_filter(entries, strip_cartesian_trace_yside_zero)
-  entries = _apply_string_filter(
-      entries,
-      lambda data: strip_default_width_for_widgets(data, ("rectangle", "polyline")),
-  )
-  entries = _apply_string_filter(entries, strip_indicator_prec_default)
-  entries = _apply_string_filter(entries, strip_text_fill)
-  entries = _apply_string_filter(entries, strip_text_width)
-  entries = _apply_string_filter(entries, strip_oval_width)
-  entries = _apply_string_filter(entries, strip_arc_width)
-  entries = _apply_string_filter(entries, strip_polyline_outline_fill)
-  entries = _apply_string_filter(entries, strip_empty_polyline_blocks)
-  entries = _apply_string_filter(entries, strip_empty_children_blocks)
-  entries = _apply_string_filter(entries, strip_default_dprecision)
-  entries = _apply_string_filter(entries, strip_default_prec_zero)
-  entries = _apply_string_filter(entries, strip_default_prec_one)
-  entries = _apply_string_filter(entries, strip_default_lopr_zero)
-  entries = _apply_string_filter(entries, strip_default_hopr_hundred)
-  entries = _apply_string_filter(entries, strip_default_channel_limit_sources)
-  entries = _apply_string_filter(entries, strip_default_direction_right)
-  entries = _apply_string_filter(entries, strip_default_dprecision_one)
-  entries = _apply_string_filter(entries, strip_default_arc_angles)
-  entries = strip_edge_spaces_in_quotes_entries(entries)
-
-  normalized: List[LineEntry] = []
-  for entry in entries:
-    stripped_lower = entry.text.strip().lower()
-    if not stripped_lower:
-      continue
-    if "name" in stripped_lower:
-      continue
-    if stripped_lower.startswith("version="):
-      continue
-    normalized.append(LineEntry(text=entry.text.strip(), line_no=entry.line_no))
-  return normalized
+def _unified_range(start: int, stop: int) -> str:
+  """Format a hunk range the way diff -u does."""
+  beginning = start + 1
+  length = stop - start
+  if length == 1:
+    return str(beginning)
+  if not length:
+    beginning -= 1
+  return f"{beginning},{length}"
 
 
-def normalize_lines_for_allowed_differences(lines: List[str]) -> List[str]:
-  """Return lines with allowed-difference fields removed."""
-  return [entry.text for entry in normalize_entries_for_allowed_differences(lines)]
+def unified_diff_ignoring_whitespace(
+    from_lines: List[str], to_lines: List[str],
+    from_name: str, to_name: str) -> str:
+  """Return diff -w -u style output computed in-process."""
+  matcher = difflib.SequenceMatcher(
+      None,
+      ["".join(line.split()) for line in from_lines],
+      ["".join(line.split()) for line in to_lines],
+  )
+  output = [f"--- {from_name}", f"+++ {to_name}"]
+  for group in matcher.get_grouped_opcodes(3):
+    first, last = group[0], group[-1]
+    output.append(
+        f"@@ -{_unified_range(first[1], last[2])} "
+        f"+{_unified_range(first[3], last[4])} @@"
+    )
+    for tag, i1, i2, j1, j2 in group:
+      if tag == "equal":
+        output.extend(" " + line for line in from_lines[i1:i2])
+        continue
+      if tag in ("replace", "delete"):
+        output.extend("-" + line for line in from_lines[i1:i2])
+      if tag in ("replace", "insert"):
+        output.extend("+" + line for line in to_lines[j1:j2])
+  return "\n".join(output)
 
 
-def files_match_with_allowed_variations(original: Path, saved: Path) -> bool:
-  """Check if files only differ by acceptable variations."""
+def compare_files(original: Path, saved: Path) -> bool:
+  """Compare files in-process and allow only approved differences."""
+  # Each file is read exactly once; every check below works on these buffers.
   try:
-    original_lines = original.read_text().splitlines()
-    saved_lines = saved.read_text().splitlines()
+    original_data = original.read_bytes()
+    saved_data = saved.read_bytes()
   except OSError as exc:
     sys.stderr.write(
-        f"Failed to read files for secondary comparison: {exc}\n"
+        f"Failed to read {saved} or {original} for comparison: {exc}\n"
     )
     return False
-
-  return (
-      normalize_lines_for_allowed_differences(original_lines)
-      == normalize_lines_for_allowed_differences(saved_lines)
-  )
-
-
-def compare_files(original: Path, saved: Path) -> bool:
-  """Run diff and allow only approved differences between files."""
-  result = subprocess.run(
-      ["diff", "-w", "-u", str(saved), str(original)],
-      stdout=subprocess.PIPE,
-      stderr=subprocess.PIPE,
-      universal_newlines=True,
-      check=False,
-  )
-  if result.returncode == 0:
+  # A byte-identical save, the common case, needs no further work at all.
+  if original_data == saved_data:
+    return True
+  original_lines = original_data.splitlines()
+  saved_lines = saved_data.splitlines()
+  if ([_whitespace_key(line) for line in saved_lines]
+      == [_whitespace_key(line) for line in original_lines]):
+    return True
+  # The original is normalized once and shared with the filtered report.
+  original_entries = normalize_entries_for_allowed_differences(original_lines)
+  if files_match_with_allowed_variations(original_entries, saved_lines):
+    return True
+  # The unified diff is only needed once the cheaper checks have failed, and
+  # it is the first point where the lines have to be decoded.
+  diff_output = unified_diff_ignoring_whitespace(
+      [line.decode(errors="replace") for line in saved_lines],
+      [line.decode(errors="replace") for line in original_lines],
+      str(saved), str(original))
+  if diff_has_only_name_changes(diff_output):
     return True
-  if result.returncode == 1:
-    if diff_has_only_name_changes(result.stdout):
-      return True
-    if files_match_with_allowed_variations(original, saved):
-      return True
-  if result.returncode not in (0, 1):
-    sys.stderr.write(
-        f"diff failed comparing {saved} and {original}: {result.stderr}\n"
-    )
-    sys.exit(result.returncode)
   print(f"Unexpected differences found in {original.name}:")
-  report_first_filtered_difference(original, saved)
-  report_first_difference(result.stdout)
-  print(result.stdout.rstrip())
+  report_first_filtered_difference(
+      original, saved, original_entries, saved_lines)
+  report_first_difference(diff_output)
+  print(diff_output.rstrip())
   return False
 
 
-def report_first_filtered_difference(original: Path, saved: Path) -> None:
+def report_first_filtered_difference(
+    original: Path, saved: Path, original_entries: List[LineEntry],
+    saved_lines: List[bytes]) -> None:
   """Show the earliest difference after applying allowed filters."""
-  try:
-    original_lines = original.read_text().splitlines()
-    saved_lines = saved.read_text().splitlines()
-  except OSError as exc:
-    sys.stderr.write(
-        f"Failed to read files for filtered diff reporting: {exc}\n"
-    )
-    return
-
-  original_entries = normalize_entries_for_allowed_differences(original_lines)
-  saved_entries = normalize_entries_for_allowed_differences(saved_lines)
-
-  max_len = max(len(original_entries), len(saved_entries))
-  for idx in range(max_len):
-    orig_entry = original_entries[idx] if idx < len(original_entries) else None
-    saved_entry = saved_entries[idx] if idx < len(saved_entries) else None
+  for orig_entry, saved_entry in itertools.zip_longest(
+      original_entries, iter_normalized_entries(saved_lines)):
     if orig_entry and saved_entry and orig_entry.text == saved_entry.text:
       continue
     print("First unexpected difference after allowed filters:")
     if orig_entry:
       print(
-          f"  original {original.name}:{orig_entry.line_no}: {orig_entry.text.strip()}"
+          f"  original {original.name}:{orig_entry.line_no}: "
+          f"{orig_entry.text.decode(errors='replace')}"
       )
     else:
       print("  original: <no line>")
     if saved_entry:
       print(
-          f"  saved {saved.name}:{saved_entry.line_no}: {saved_entry.text.strip()}"
+          f"  saved {saved.name}:{saved_entry.line_no}: "
+          f"{saved_entry.text.decode(errors='replace')}"
       )
     else:
       print("  saved: <no line>")
@@ -1056,6 +748,18 @@ def paths_from_manifest(manifest_path: Path) -> List[Path]:
   return adl_files
 
 
+def adl_files_in_directory(directory: Path) -> List[Path]:
+  """Return the *.adl files directly inside a directory, sorted by name."""
+  # scandir's entries carry the file type from the directory read, so only
+  # the matching names are sorted and turned into Paths.
+  with os.scandir(directory) as entries:
+    names = sorted(
+        entry.name for entry in entries
+        if entry.name.endswith(".adl") and entry.is_file()
+    )
+  return [directory / name for name in names]
+
+
 def collect_adl_files(
     direct_paths: List[str], manifest_paths: List[str],
     scan_dirs: List[str]) -> List[Path]:
@@ -1072,12 +776,12 @@ def collect_adl_files(
     directory = Path(scan_dir).expanduser().resolve()
     if not directory.is_dir():
       raise FileNotFoundError(f"Scan directory not found: {directory}")
-    candidates.extend(sorted(directory.glob("*.adl")))
+    candidates.extend(adl_files_in_directory(directory))
 
   for entry in direct_paths:
     path = Path(entry).expanduser().resolve()
     if path.is_dir():
-      candidates.extend(sorted(path.glob("*.adl")))
+      candidates.extend(adl_files_in_directory(path))
     else:
       candidates.append(path)
 
@@ -1120,7 +824,21 @@ def main() -> int:
   parser.add_argument(
       "--output",
       default="/tmp/qtedmTest.adl",
-      help="Path used for qtedm -testSave output",
+      help=("Path the failing qtedm save is copied to for inspection; each "
+            "batch is saved to a temporary <stem>-* directory beside it that "
+            "is removed once its files are compared"),
+  )
+  parser.add_argument(
+      "--batch-size",
+      type=int,
+      default=BATCH_SIZE,
+      help="Number of ADL files saved by each qtedm -testSaveBatch run",
+  )
+  parser.add_argument(
+      "--jobs",
+      type=int,
+      default=os.cpu_count() or 1,
+      help="Number of qtedm batch runs to execute concurrently",
   )
   args = parser.parse_args()
 
@@ -1152,19 +870,53 @@ def main() -> int:
       sys.stderr.write(f"ADL file not found: {adl_path}\n")
       print(f"SUMMARY: FAIL stage=setup file={adl_path}")
       return EXIT_SETUP_ERROR
-    if output_path.exists():
-      output_path.unlink()
-    qtedm_status = run_qtedm(adl_path, qtedm_path, output_path)
-    if qtedm_status != 0:
-      print(f"SUMMARY: FAIL stage=qtedm file={adl_path}")
-      return EXIT_QTEDM_FAILURE
-    if not output_path.is_file():
-      sys.stderr.write(f"Expected output file not found: {output_path}\n")
-      print(f"SUMMARY: FAIL stage=output file={adl_path}")
-      return EXIT_SETUP_ERROR
-    if not compare_files(adl_path, output_path):
-      print(f"SUMMARY: FAIL stage=diff file={adl_path}")
-      return EXIT_DIFF_FAILURE
+
+  # Each qtedm run saves a whole batch into its own directory, which spreads
+  # the application start-up cost over many files; batches fan out across
+  # workers while comparisons stay on this thread to keep the diff reports
+  # from interleaving.
+  batches = batch_adl_files(adl_files, max(1, args.batch_size))
+  jobs = max(1, min(args.jobs, len(batches)))
+  batch_dirs = [
+      tempfile.TemporaryDirectory(
+          prefix=f"{output_path.stem}-", dir=output_path.parent)
+      for _ in batches
+  ]
+  try:
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+      futures = {
+          executor.submit(
+              save_adl_batch, batch, qtedm_path, Path(batch_dir.name)):
+              batch_dir
+          for batch, batch_dir in zip(batches, batch_dirs)
+      }
+      for future in as_completed(futures):
+        for result in future.result():
+          status = 0
+          if result.stage == "qtedm":
+            print(f"SUMMARY: FAIL stage=qtedm file={result.adl_path}")
+            status = EXIT_QTEDM_FAILURE
+          elif result.stage == "output":
+            print(f"SUMMARY: FAIL stage=output file={result.adl_path}")
+            status = EXIT_SETUP_ERROR
+          elif not compare_files(result.adl_path, result.output_path):
+            print(f"SUMMARY: FAIL stage=diff file={result.adl_path}")
+            status = EXIT_DIFF_FAILURE
+          if status:
+            # The batch directory is about to be removed, so the failing save
+            # is kept at --output for inspection.
+            if result.output_path.is_file():
+              shutil.copyfile(result.output_path, output_path)
+              sys.stderr.write(f"Saved output kept at {output_path}\n")
+            for pending in futures:
+              pending.cancel()
+            return status
+        futures[future].cleanup()
+  finally:
+    # Leaving the executor waits for running batches, so nothing is still
+    # writing into these directories.
+    for batch_dir in batch_dirs:
+      batch_dir.cleanup()
 
   print(f"SUMMARY: PASS files={len(adl_files)}")
   return 0